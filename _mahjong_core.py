@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+听牌扫描的numba JIT内核（可选加速模块）
+numpy/numba缺失时导入失败，mahjong_tingpai会自动退回纯Python实现；
+与主模块中的纯Python检查保持同构
+"""
+
+import numpy as np
+from numba import njit
+
+
+# 注意：这些内核不能开cache=True——自递归函数从numba磁盘缓存
+# 重新加载后首次调用会段错误，只能每个进程重新编译
+@njit
+def _search_std(counts, start, melds, pairs):
+    """int8[34]计数向量上的4面子+1对子回溯"""
+    i = start
+    while i < 34 and counts[i] == 0:
+        i += 1
+    if i == 34:
+        return melds == 4 and pairs == 1
+
+    if pairs == 0 and counts[i] >= 2:
+        counts[i] -= 2
+        found = _search_std(counts, i, melds, 1)
+        counts[i] += 2
+        if found:
+            return True
+
+    if counts[i] >= 3:
+        counts[i] -= 3
+        found = _search_std(counts, i, melds + 1, pairs)
+        counts[i] += 3
+        if found:
+            return True
+
+    if i < 27 and i % 9 <= 6 and counts[i + 1] > 0 and counts[i + 2] > 0:
+        counts[i] -= 1
+        counts[i + 1] -= 1
+        counts[i + 2] -= 1
+        found = _search_std(counts, i, melds + 1, pairs)
+        counts[i] += 1
+        counts[i + 1] += 1
+        counts[i + 2] += 1
+        if found:
+            return True
+
+    return False
+
+
+@njit
+def _can_win(counts):
+    """14张计数向量的胡牌判断（七对子/国士无双/标准胡牌）"""
+    pairs = 0
+    for i in range(34):
+        if counts[i] == 2:
+            pairs += 1
+    if pairs == 7:
+        return True
+
+    # 国士无双：非幺九牌必须为0，13种幺九牌12单1对
+    ok = True
+    orphan_pairs = 0
+    for i in range(34):
+        c = counts[i]
+        if i >= 27 or i % 9 == 0 or i % 9 == 8:
+            if c == 0 or c > 2:
+                ok = False
+                break
+            if c == 2:
+                orphan_pairs += 1
+        elif c != 0:
+            ok = False
+            break
+    if ok and orphan_pairs == 1:
+        return True
+
+    return _search_std(counts, 0, 0, 0)
+
+
+@njit
+def _winning_mask(counts):
+    """逐张试摸34种牌，返回可胡牌的位掩码"""
+    mask = 0
+    for t in range(34):
+        counts[t] += 1
+        if _can_win(counts):
+            mask |= 1 << t
+        counts[t] -= 1
+    return mask
+
+
+def can_win(counts):
+    """
+    判断14张计数向量（list/序列）是否胡牌
+    """
+    return bool(_can_win(np.asarray(counts, dtype=np.int8)))
+
+
+def winning_mask(counts):
+    """
+    对13张计数向量（list/序列）逐张试摸，返回34位听牌掩码
+    """
+    return int(_winning_mask(np.asarray(counts, dtype=np.int8)))
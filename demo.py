@@ -7,6 +7,59 @@
 
 from mahjong_tingpai import MahjongTingpai
 
+# 演示用例只读不改，挂在模块级避免每次调用重建
+EXAMPLES = (
+    {
+        'name': '两面听牌示例',
+        'hand': '12345678m112p34p',  # 13张牌：万子1-8 + 筒子1,1,2,3,4
+        'explanation': '万子1-8连续，筒子有1,1,2,3,4，缺2筒或5筒可胡牌'
+    },
+    {
+        'name': '七对子听牌',
+        'hand': '1122334455667m8',  # 13张牌：万子七对子型
+        'explanation': '已有6个对子，再来一张8万就是七对子胡牌'
+    },
+    {
+        'name': '字牌听牌',
+        'hand': '123m456p789s111z2z',  # 13张牌：各花色顺子+东风刻子
+        'explanation': '三个顺子加东风刻子，再来一张南风(2z)组成对子即可胡牌'
+    },
+    {
+        'name': '单钓听牌',
+        'hand': '111222333m444p5p',  # 13张牌：三个刻子+一个对子+单张
+        'explanation': '已有三个刻子和一个对子，单钓5筒胡牌'
+    },
+    {
+        'name': '边张听牌',
+        'hand': '12345678m111p12p',  # 13张牌：万子1-8+筒子刻子+12
+        'explanation': '筒子1,2需要3筒组成顺子，边张听牌'
+    },
+    {
+        'name': '坎张听牌',
+        'hand': '12345678m111p13p',  # 13张牌：万子1-8+筒子刻子+13
+        'explanation': '筒子1,3需要2筒组成顺子，坎张听牌'
+    }
+)
+
+FORMAT_EXAMPLES = (
+    {
+        'input': '123456789s1234m',
+        'description': '条子1-9 + 万子1-4 (连续数字写法)'
+    },
+    {
+        'input': '1s2s3s4s5s6s7s8s9s1m2m3m4m',
+        'description': '条子1-9 + 万子1-4 (单个数字写法)'
+    },
+    {
+        'input': '111222333m444p5p',
+        'description': '万子三个刻子 + 筒子4,4,4,5 (重复数字写法)'
+    },
+    {
+        'input': '1234567z123456s',
+        'description': '所有字牌 + 条子1-6'
+    }
+)
+
 def demo_basic_usage():
     """
     基本使用演示
@@ -14,45 +67,11 @@ def demo_basic_usage():
     print("=" * 60)
     print("麻将听牌程序 - 使用演示")
     print("=" * 60)
-    
+
     # 创建分析器
     analyzer = MahjongTingpai()
-    
-    # 演示各种听牌情况
-    examples = [
-        {
-            'name': '两面听牌示例',
-            'hand': '12345678m112p34p',  # 13张牌：万子1-8 + 筒子1,1,2,3,4
-            'explanation': '万子1-8连续，筒子有1,1,2,3,4，缺2筒或5筒可胡牌'
-        },
-        {
-            'name': '七对子听牌',
-            'hand': '1122334455667m8',  # 13张牌：万子七对子型
-            'explanation': '已有6个对子，再来一张8万就是七对子胡牌'
-        },
-        {
-            'name': '字牌听牌',
-            'hand': '123m456p789s111z2z',  # 13张牌：各花色顺子+东风刻子
-            'explanation': '三个顺子加东风刻子，再来一张南风(2z)组成对子即可胡牌'
-        },
-        {
-            'name': '单钓听牌',
-            'hand': '111222333m444p5p',  # 13张牌：三个刻子+一个对子+单张
-            'explanation': '已有三个刻子和一个对子，单钓5筒胡牌'
-        },
-        {
-            'name': '边张听牌',
-            'hand': '12345678m111p12p',  # 13张牌：万子1-8+筒子刻子+12
-            'explanation': '筒子1,2需要3筒组成顺子，边张听牌'
-        },
-        {
-            'name': '坎张听牌',
-            'hand': '12345678m111p13p',  # 13张牌：万子1-8+筒子刻子+13
-            'explanation': '筒子1,3需要2筒组成顺子，坎张听牌'
-        }
-    ]
-    
-    for i, example in enumerate(examples, 1):
+
+    for i, example in enumerate(EXAMPLES, 1):
         print(f"\n示例 {i}: {example['name']}")
         print(f"手牌输入: {example['hand']}")
         print(f"说明: {example['explanation']}")
@@ -92,27 +111,8 @@ def demo_input_formats():
     print("=" * 60)
     
     analyzer = MahjongTingpai()
-    
-    format_examples = [
-        {
-            'input': '123456789s1234m',
-            'description': '条子1-9 + 万子1-4 (连续数字写法)'
-        },
-        {
-            'input': '1s2s3s4s5s6s7s8s9s1m2m3m4m',
-            'description': '条子1-9 + 万子1-4 (单个数字写法)'
-        },
-        {
-            'input': '111222333m444p5p',
-            'description': '万子三个刻子 + 筒子4,4,4,5 (重复数字写法)'
-        },
-        {
-            'input': '1234567z123456s',
-            'description': '所有字牌 + 条子1-6'
-        }
-    ]
-    
-    for example in format_examples:
+
+    for example in FORMAT_EXAMPLES:
         print(f"\n输入: {example['input']}")
         print(f"说明: {example['description']}")
         
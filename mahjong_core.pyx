@@ -0,0 +1,104 @@
+# cython: boundscheck=False, wraparound=False
+# -*- coding: utf-8 -*-
+"""
+听牌判断的可选Cython加速内核
+与mahjong_tingpai.py中的纯Python/numba实现保持同构：
+调用方传入bytearray(34)计数向量，函数只做整数运算
+"""
+
+
+cdef bint _search_std(unsigned char[:] counts, int start, int melds, int pairs):
+    """4面子+1对子回溯（原地修改、回溯恢复）"""
+    cdef int i = start
+    cdef bint found
+
+    while i < 34 and counts[i] == 0:
+        i += 1
+    if i == 34:
+        return melds == 4 and pairs == 1
+
+    # 对子（只有当还没有对子时）
+    if pairs == 0 and counts[i] >= 2:
+        counts[i] -= 2
+        found = _search_std(counts, i, melds, 1)
+        counts[i] += 2
+        if found:
+            return True
+
+    # 刻子
+    if counts[i] >= 3:
+        counts[i] -= 3
+        found = _search_std(counts, i, melds + 1, pairs)
+        counts[i] += 3
+        if found:
+            return True
+
+    # 顺子（字牌除外，不跨花色）
+    if i < 27 and i % 9 <= 6 and counts[i + 1] > 0 and counts[i + 2] > 0:
+        counts[i] -= 1
+        counts[i + 1] -= 1
+        counts[i + 2] -= 1
+        found = _search_std(counts, i, melds + 1, pairs)
+        counts[i] += 1
+        counts[i + 1] += 1
+        counts[i + 2] += 1
+        if found:
+            return True
+
+    return False
+
+
+cpdef bint can_win(unsigned char[:] counts):
+    """14张计数向量的胡牌判断（七对子/国士无双/标准胡牌）"""
+    cdef int i, c
+    cdef int pairs = 0
+    cdef int orphan_pairs = 0
+    cdef bint ok = True
+
+    # 七对子
+    for i in range(34):
+        if counts[i] == 2:
+            pairs += 1
+    if pairs == 7:
+        return True
+
+    # 国士无双：非幺九牌必须为0，13种幺九牌12单1对
+    for i in range(34):
+        c = counts[i]
+        if i >= 27 or i % 9 == 0 or i % 9 == 8:
+            if c == 0 or c > 2:
+                ok = False
+                break
+            if c == 2:
+                orphan_pairs += 1
+        elif c != 0:
+            ok = False
+            break
+    if ok and orphan_pairs == 1:
+        return True
+
+    return _search_std(counts, 0, 0, 0)
+
+
+cpdef bint is_seven_pairs(unsigned char[:] counts):
+    """14张计数向量的七对子判断"""
+    cdef int i
+    cdef int pairs = 0
+    for i in range(34):
+        if counts[i] == 2:
+            pairs += 1
+    return pairs == 7
+
+
+cpdef unsigned long long winning_mask(unsigned char[:] counts):
+    """逐张试摸34种牌，返回可胡牌的位掩码"""
+    cdef unsigned long long mask = 0
+    cdef int t
+
+    for t in range(34):
+        counts[t] += 1
+        if can_win(counts):
+            mask |= 1ULL << t
+        counts[t] -= 1
+
+    return mask
@@ -12,61 +12,419 @@
 - j: 百搭牌（可以替代任何牌）
 """
 
-import re
-from collections import Counter
-from typing import List, Set, Tuple
-from itertools import product
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, List, Set, Tuple
+from itertools import combinations_with_replacement, product
+
+# 所有可能的牌（不包括百搭牌）：驻留的模块级常量，
+# 实例只挂引用，紧凑循环里可按身份比较
+NORMAL_TILES = tuple(sys.intern(t) for t in (
+    [f"{i}s" for i in range(1, 10)] +  # 条子
+    [f"{i}m" for i in range(1, 10)] +  # 万子
+    [f"{i}p" for i in range(1, 10)] +  # 筒子
+    [f"{i}z" for i in range(1, 8)]    # 字牌：东南西北白发中
+))
+
+# 包括百搭牌的所有牌
+ALL_TILES = NORMAL_TILES + (sys.intern('j'),)
+
+# 国士无双的幺九牌
+TERMINAL_HONOR_TILES = tuple(sys.intern(t) for t in (
+    '1s', '9s',  # 一九条
+    '1m', '9m',  # 一九万
+    '1p', '9p',  # 一九筒
+    '1z', '2z', '3z', '4z', '5z', '6z', '7z'  # 东南西北白发中
+))
+
+# _classify的牌组分类结果
+MELD_NONE = 0
+MELD_PAIR = 1
+MELD_TRIPLET = 2
+MELD_SEQUENCE = 3
+
+# 花色字母 -> (计数向量起始索引, 最大数字)
+_SUIT_BASE: Dict[str, Tuple[int, int]] = {
+    's': (0, 9), 'm': (9, 9), 'p': (18, 9), 'z': (27, 7)
+}
+
+# 34种牌按字符串字典序（数字优先，花色m<p<s<z）排列的索引序，
+# 供展开计数向量时直接产出有序结果
+_LEX_IDS = tuple(
+    base + num for num in range(9)
+    for base in (9, 18, 0, 27)
+    if not (base == 27 and num > 6)
+)
+
+# 计数向量按每张牌4比特打包成单个整数时使用的SWAR常量
+_NIBBLE_ONES = int('1' * 34, 16)
+_NIBBLE_TWOS = _NIBBLE_ONES * 2
+_NIBBLE_EIGHTS = _NIBBLE_ONES * 8
+
+def _pack_counts(counts: List[int]) -> int:
+    """
+    把34长度计数向量打包成整数（每张牌4比特），作为紧凑指纹
+    """
+    packed = 0
+    for c in reversed(counts):
+        packed = (packed << 4) | c
+    return packed
+
+def _seven_pairs_packed(packed: int) -> bool:
+    """
+    SWAR版七对子检查：数出值恰好为2的4比特槽位个数
+    """
+    x = packed ^ _NIBBLE_TWOS
+    zero_slots = (x - _NIBBLE_ONES) & ~x & _NIBBLE_EIGHTS
+    return zero_slots.bit_count() == 7
+
+# 预编译的Cython内核（见mahjong_core.pyx / setup.py）优先：
+# 无JIT预热开销，打包的GUI环境里也可用
+try:
+    from mahjong_core import winning_mask as _cy_winning_mask
+except ImportError:
+    _cy_winning_mask = None
+
+# 百搭替换多重集只取决于百搭数，按k缓存一份进程内共享
+_JOKER_MULTISETS: Dict[int, tuple] = {}
+
+def _joker_multisets(k: int) -> tuple:
+    """
+    k张百搭的全部替换多重集（牌索引非降序元组），首次使用时生成
+    """
+    combos = _JOKER_MULTISETS.get(k)
+    if combos is None:
+        combos = tuple(combinations_with_replacement(range(34), k))
+        _JOKER_MULTISETS[k] = combos
+    return combos
+
+# 多百搭手牌的34候选检查是独立纯函数，按进程池并行分摊
+# 进程池与工作进程里的分析器都按需创建、整个进程生命周期复用
+_CANDIDATE_POOL = None
+_WORKER_ENGINE = None
+
+def _candidate_pool():
+    global _CANDIDATE_POOL
+    if _CANDIDATE_POOL is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _CANDIDATE_POOL = ProcessPoolExecutor()
+    return _CANDIDATE_POOL
+
+def _discard_candidate_pool():
+    """
+    丢弃已损坏的进程池，避免污染后续调用；下次需要时重建
+    """
+    global _CANDIDATE_POOL
+    if _CANDIDATE_POOL is not None:
+        _CANDIDATE_POOL.shutdown(wait=False, cancel_futures=True)
+        _CANDIDATE_POOL = None
+
+def _check_candidate(args: Tuple[bytes, int, str]) -> Tuple[str, bool]:
+    """
+    进程池工作函数：基础计数向量+候选牌在k张百搭下能否胡牌
+    """
+    global _WORKER_ENGINE
+    if _WORKER_ENGINE is None:
+        _WORKER_ENGINE = MahjongTingpaiWithJoker()
+
+    key, joker_count, tile = args
+    counts = list(key)
+    if tile == 'j':
+        joker_count += 1
+    else:
+        counts[_WORKER_ENGINE._tile_ids[tile]] += 1
+
+    return tile, _WORKER_ENGINE._joker_winning(counts, min(joker_count, 4))
+
+# numba JIT内核（见_mahjong_core.py）为可选加速依赖：
+# 可用时整个听牌扫描在原生代码里跑，否则退回下面的纯Python实现
+try:
+    from _mahjong_core import winning_mask as _jit_winning_mask
+except ImportError:
+    _jit_winning_mask = None
+
+# 花色块拆分可行性表：块计数元组 -> 位掩码，位(m*2+p)表示
+# 该块可以恰好拆成m个面子加p个对子（用光块内所有牌）
+_SUIT_BLOCK_TABLE: Dict[Tuple[int, ...], int] = {}
+_HONOR_BLOCK_TABLE: Dict[Tuple[int, ...], int] = {}
+
+_NO_PAIR_BITS = 0x155  # p=0的所有位
+
+def _compute_block_mask(counts: List[int], allow_sequence: bool) -> int:
+    """
+    递归枚举一个花色块的所有整体拆分，返回可行(面子数,对子数)位掩码
+    """
+    i = 0
+    n = len(counts)
+    while i < n and counts[i] == 0:
+        i += 1
+    if i == n:
+        return 1  # 空块：0面子0对子
+
+    mask = 0
+
+    # 对子（每个块最多保留1个，多于1个对子的拆分不可能凑成胡牌）
+    if counts[i] >= 2:
+        counts[i] -= 2
+        sub = _compute_block_mask(counts, allow_sequence)
+        counts[i] += 2
+        mask |= (sub & _NO_PAIR_BITS) << 1
+
+    # 刻子
+    if counts[i] >= 3:
+        counts[i] -= 3
+        sub = _compute_block_mask(counts, allow_sequence)
+        counts[i] += 3
+        mask |= (sub << 2) & 0x3FF
+
+    # 顺子（字牌块不允许）
+    if (allow_sequence and i % 9 <= 6 and
+            counts[i + 1] > 0 and counts[i + 2] > 0):
+        counts[i] -= 1
+        counts[i + 1] -= 1
+        counts[i + 2] -= 1
+        sub = _compute_block_mask(counts, allow_sequence)
+        counts[i] += 1
+        counts[i + 1] += 1
+        counts[i + 2] += 1
+        mask |= (sub << 2) & 0x3FF
+
+    return mask
+
+def _block_mask(block: Tuple[int, ...], allow_sequence: bool,
+                table: Dict[Tuple[int, ...], int]) -> int:
+    """
+    查表获取花色块的拆分位掩码，首次遇到的块计算后缓存
+    """
+    mask = table.get(block)
+    if mask is None:
+        mask = _compute_block_mask(list(block), allow_sequence)
+        table[block] = mask
+    return mask
+
+# 10位(面子,对子)掩码 -> 5位纯面子数位集（无对子/含对子两张表），
+# 供组合时的两阶段判断使用
+_MELDS_NO_PAIR = tuple(
+    sum(1 << m for m in range(5) if v >> (2 * m) & 1) for v in range(1024)
+)
+_MELDS_WITH_PAIR = tuple(
+    sum(1 << m for m in range(5) if v >> (2 * m + 1) & 1) for v in range(1024)
+)
+
+def _combine_block_masks(masks: Tuple[int, int, int, int]) -> bool:
+    """
+    组合4个花色块的拆分位掩码，判断能否凑出4面子+1对子
+    两阶段：先选定提供将头的块（取其含对子拆分），
+    再对4个块的面子数位集做移位卷积，看总数能否恰好到4
+    """
+    melds_no_pair = (_MELDS_NO_PAIR[masks[0]], _MELDS_NO_PAIR[masks[1]],
+                     _MELDS_NO_PAIR[masks[2]], _MELDS_NO_PAIR[masks[3]])
+
+    for b in range(4):
+        acc = _MELDS_WITH_PAIR[masks[b]]
+        if not acc:
+            continue
+        for o in range(4):
+            if o == b:
+                continue
+            x = melds_no_pair[o]
+            conv = 0
+            for m in range(5):
+                if acc >> m & 1:
+                    conv |= x << m
+            acc = conv & 0x1F
+            if not acc:
+                break
+        if acc >> 4 & 1:
+            return True
+
+    return False
+
+# 块(m,t,p)状态表：m=面子数 t=搭子数 p=有无对子，允许块内留闲张
+# 向听数计算使用；与上面的整块拆分表分开缓存
+_SUIT_STATE_TABLE: Dict[Tuple[int, ...], frozenset] = {}
+_HONOR_STATE_TABLE: Dict[Tuple[int, ...], frozenset] = {}
+
+def _block_states(block: Tuple[int, ...], allow_sequence: bool,
+                  table: Dict[Tuple[int, ...], frozenset]) -> frozenset:
+    """
+    花色块可取出的(面子数,搭子数,对子)状态集（可留闲张）
+    每层递归都以剩余计数元组查表，子问题在块之间、手牌之间复用，
+    密集块不再逐块重新枚举整棵子集树
+    """
+    states = table.get(block)
+    if states is not None:
+        return states
+
+    i = 0
+    n = len(block)
+    while i < n and block[i] == 0:
+        i += 1
+    if i == n:
+        states = frozenset({(0, 0, 0)})
+        table[block] = states
+        return states
+
+    result = set()
+
+    # 当前牌当闲张
+    rest = block[:i] + (block[i] - 1,) + block[i + 1:]
+    result.update(_block_states(rest, allow_sequence, table))
+
+    # 对子：既可以做将，也可以当搭子（将来成刻子）
+    if block[i] >= 2:
+        rest = block[:i] + (block[i] - 2,) + block[i + 1:]
+        for m, t, p in _block_states(rest, allow_sequence, table):
+            if p == 0:
+                result.add((m, t, 1))
+            if t < 4:
+                result.add((m, t + 1, p))
+
+    # 刻子
+    if block[i] >= 3:
+        rest = block[:i] + (block[i] - 3,) + block[i + 1:]
+        for m, t, p in _block_states(rest, allow_sequence, table):
+            if m < 4:
+                result.add((m + 1, t, p))
+
+    if allow_sequence:
+        # 顺子
+        if i <= 6 and block[i + 1] > 0 and block[i + 2] > 0:
+            rest = (block[:i] + (block[i] - 1, block[i + 1] - 1,
+                                 block[i + 2] - 1) + block[i + 3:])
+            for m, t, p in _block_states(rest, allow_sequence, table):
+                if m < 4:
+                    result.add((m + 1, t, p))
+
+        # 两面/边张搭子
+        if i <= 7 and block[i + 1] > 0:
+            rest = (block[:i] + (block[i] - 1, block[i + 1] - 1) +
+                    block[i + 2:])
+            for m, t, p in _block_states(rest, allow_sequence, table):
+                if t < 4:
+                    result.add((m, t + 1, p))
+
+        # 坎张搭子
+        if i <= 6 and block[i + 2] > 0:
+            rest = (block[:i] + (block[i] - 1, block[i + 1],
+                                 block[i + 2] - 1) + block[i + 3:])
+            for m, t, p in _block_states(rest, allow_sequence, table):
+                if t < 4:
+                    result.add((m, t + 1, p))
+
+    states = frozenset(result)
+    table[block] = states
+    return states
+
+def warm_block_tables() -> None:
+    """
+    预先枚举所有可能出现的花色块（每种牌0-4张、块内总和<=14），
+    填满懒加载的拆分可行性表，之后的查询全部是纯字典命中
+    耗时约2秒；设置环境变量MAHJONG_PRECOMPUTE_TABLES=1可在导入时执行
+    """
+    for block in product(range(5), repeat=9):
+        if sum(block) <= 14 and block not in _SUIT_BLOCK_TABLE:
+            _SUIT_BLOCK_TABLE[block] = _compute_block_mask(list(block), True)
+    for block in product(range(5), repeat=7):
+        if sum(block) <= 14 and block not in _HONOR_BLOCK_TABLE:
+            _HONOR_BLOCK_TABLE[block] = _compute_block_mask(list(block), False)
+
+if os.environ.get('MAHJONG_PRECOMPUTE_TABLES'):
+    warm_block_tables()
 
 class MahjongTingpaiWithJoker:
+    # 固定槽位：实例字典省掉，热路径上的属性访问也更快，
+    # 顺带能在测试期暴露属性名拼写错误
+    __slots__ = (
+        'honor_names',
+        '_tile_ids', '_id_to_tile', '_orphan_ids', '_orphan_id_set',
+        '_display_name',
+    )
+
+    # 牌表是模块级常量，挂在类上免去逐实例重建
+    normal_tiles = NORMAL_TILES
+    all_tiles = ALL_TILES
+    terminal_honor_tiles = TERMINAL_HONOR_TILES
+
     def __init__(self):
-        # 定义所有可能的牌（不包括百搭牌）
-        self.normal_tiles = (
-            [f"{i}s" for i in range(1, 10)] +  # 条子
-            [f"{i}m" for i in range(1, 10)] +  # 万子
-            [f"{i}p" for i in range(1, 10)] +  # 筒子
-            [f"{i}z" for i in range(1, 8)]    # 字牌：东南西北白发中
-        )
-        
-        # 包括百搭牌的所有牌
-        self.all_tiles = self.normal_tiles + ['j']
-        
         # 字牌名称映射
         self.honor_names = {
             '1z': '东', '2z': '南', '3z': '西', '4z': '北',
             '5z': '白', '6z': '发', '7z': '中', 'j': '百搭'
         }
-        
-        # 国士无双的幺九牌
-        self.terminal_honor_tiles = [
-            '1s', '9s',  # 一九条
-            '1m', '9m',  # 一九万
-            '1p', '9p',  # 一九筒
-            '1z', '2z', '3z', '4z', '5z', '6z', '7z'  # 东南西北白发中
-        ]
+
+        # 牌 <-> 索引(0..33)映射，计数向量算法使用
+        self._tile_ids = {tile: i for i, tile in enumerate(self.normal_tiles)}
+        self._id_to_tile = list(self.normal_tiles)
+        self._orphan_ids = [self._tile_ids[t] for t in self.terminal_honor_tiles]
+        self._orphan_id_set = frozenset(self._orphan_ids)
+
+        # 预计算的显示名称表
+        suit_names = {'s': '条', 'm': '万', 'p': '筒'}
+        self._display_name = {'j': '百搭'}
+        for tile in self.normal_tiles:
+            if tile.endswith('z'):
+                self._display_name[tile] = self.honor_names.get(tile, tile)
+            else:
+                self._display_name[tile] = f"{tile[0]}{suit_names[tile[-1]]}"
     
     def parse_hand(self, hand_str: str) -> List[str]:
         """
         解析手牌字符串，支持百搭牌j
         例如: "123456789s1234m12pj" -> ['1s', '2s', '3s', ..., 'j']
         """
-        tiles = []
-        
-        # 处理百搭牌
-        joker_count = hand_str.count('j')
-        hand_str_no_joker = hand_str.replace('j', '')
-        
-        # 处理普通牌
-        pattern = r'(\d+)([smpz])'
-        matches = re.findall(pattern, hand_str_no_joker)
-        
-        for numbers, suit in matches:
-            for num in numbers:
-                tiles.append(f"{num}{suit}")
-        
-        # 添加百搭牌
-        tiles.extend(['j'] * joker_count)
-        
-        return sorted(tiles)
+        counts, joker_count, invalid_tiles = self._parse_counts(hand_str)
+        return self._expand_counts(counts, joker_count, invalid_tiles)
+
+    def _expand_counts(self, counts: List[int], joker_count: int,
+                       invalid_tiles: List[str] = ()) -> List[str]:
+        """
+        把计数向量展开回排序的牌列表
+        按_LEX_IDS的桶序产出即为字典序，普通路径不需要再排序
+        """
+        if invalid_tiles:
+            # 超范围的牌无法走桶序，退回普通排序
+            tiles = [self._id_to_tile[i] for i in range(34)
+                     for _ in range(counts[i])]
+            tiles.extend(invalid_tiles)
+            tiles.extend(['j'] * joker_count)
+            return sorted(tiles)
+
+        tiles = [self._id_to_tile[i] for i in _LEX_IDS for _ in range(counts[i])]
+        tiles.extend(['j'] * joker_count)  # 'j'比所有数字开头的牌都大
+        return tiles
+
+    def _parse_counts(self, hand_str: str) -> Tuple[List[int], int, List[str]]:
+        """
+        单遍扫描手牌字符串，直接生成34长度计数向量
+        返回(计数向量, 百搭牌数, 数字超出范围的牌如'0m'/'8z')
+        """
+        counts = [0] * 34
+        joker_count = 0
+        invalid_tiles = []
+        digits = ''
+
+        for ch in hand_str:
+            if '0' <= ch <= '9':
+                digits += ch
+            elif ch in _SUIT_BASE:
+                base, limit = _SUIT_BASE[ch]
+                for d in digits:
+                    num = ord(d) - ord('0')
+                    if 1 <= num <= limit:
+                        counts[base + num - 1] += 1
+                    else:
+                        invalid_tiles.append(d + ch)
+                digits = ''
+            elif ch == 'j':
+                # 百搭牌不打断数字串（原先是先剔除j再匹配）
+                joker_count += 1
+            else:
+                # 其他字符打断数字串，之前的数字作废
+                digits = ''
+
+        return counts, joker_count, invalid_tiles
     
     def generate_joker_combinations(self, hand: List[str]) -> List[List[str]]:
         """
@@ -82,65 +440,57 @@ class MahjongTingpaiWithJoker:
         # 如果百搭牌太多，限制组合数量以避免性能问题
         if joker_count > 4:
             joker_count = 4
-        
-        # 生成所有可能的替换组合
-        combinations = []
-        for replacement in product(self.normal_tiles, repeat=joker_count):
-            new_hand = base_hand + list(replacement)
-            combinations.append(sorted(new_hand))
-        
-        # 去重
-        unique_combinations = []
-        seen = set()
-        for combo in combinations:
-            combo_tuple = tuple(combo)
-            if combo_tuple not in seen:
-                seen.add(combo_tuple)
-                unique_combinations.append(combo)
-        
-        return unique_combinations
+
+        # 替换多重集与手牌无关，取预生成的索引元组展开即可
+        return [sorted(base_hand + [self._id_to_tile[i] for i in replacement])
+                for replacement in _joker_multisets(joker_count)]
     
+    def _classify(self, tiles: List[str]) -> int:
+        """
+        单趟判断牌组类型，返回MELD_*常量（无set/sorted分配）
+        """
+        if len(tiles) == 2:
+            return MELD_PAIR if tiles[0] == tiles[1] else MELD_NONE
+        if len(tiles) != 3:
+            return MELD_NONE
+
+        a, b, c = tiles
+        if a == b == c:
+            return MELD_TRIPLET
+
+        # 顺子：同一个非字牌花色，数字互不相同且跨度恰好为2
+        suit = a[-1]
+        if suit == 'z' or b[-1] != suit or c[-1] != suit:
+            return MELD_NONE
+        n1, n2, n3 = int(a[0]), int(b[0]), int(c[0])
+        if (n1 != n2 and n2 != n3 and n1 != n3 and
+                max(n1, n2, n3) - min(n1, n2, n3) == 2):
+            return MELD_SEQUENCE
+        return MELD_NONE
+
     def is_valid_sequence(self, tiles: List[str]) -> bool:
         """
         检查是否为有效顺子（3张连续的同花色牌）
         """
-        if len(tiles) != 3:
-            return False
-        
-        # 字牌不能组成顺子
-        if any(tile.endswith('z') for tile in tiles):
-            return False
-        
-        # 检查花色是否相同
-        suits = [tile[-1] for tile in tiles]
-        if len(set(suits)) != 1:
-            return False
-        
-        # 检查数字是否连续
-        numbers = sorted([int(tile[0]) for tile in tiles])
-        return numbers == [numbers[0], numbers[0]+1, numbers[0]+2]
-    
+        return self._classify(tiles) == MELD_SEQUENCE
+
     def is_valid_triplet(self, tiles: List[str]) -> bool:
         """
         检查是否为有效刻子（3张相同的牌）
         """
-        return len(tiles) == 3 and len(set(tiles)) == 1
-    
+        return self._classify(tiles) == MELD_TRIPLET
+
     def is_valid_pair(self, tiles: List[str]) -> bool:
         """
         检查是否为有效对子（2张相同的牌）
         """
-        return len(tiles) == 2 and tiles[0] == tiles[1]
-    
+        return self._classify(tiles) == MELD_PAIR
+
     def can_form_meld(self, tiles: List[str]) -> bool:
         """
         检查牌组是否能组成面子或对子
         """
-        if len(tiles) == 2:
-            return self.is_valid_pair(tiles)
-        elif len(tiles) == 3:
-            return self.is_valid_sequence(tiles) or self.is_valid_triplet(tiles)
-        return False
+        return self._classify(tiles) != MELD_NONE
     
     def _check_thirteen_orphans(self, tiles: List[str]) -> bool:
         """
@@ -149,29 +499,8 @@ class MahjongTingpaiWithJoker:
         """
         if len(tiles) != 14:
             return False
-            
-        tile_count = Counter(tiles)
-        
-        # 检查是否只包含幺九牌
-        for tile in tiles:
-            if tile not in self.terminal_honor_tiles:
-                return False
-        
-        # 检查是否有且仅有一个对子，其余都是单张
-        pair_count = 0
-        single_count = 0
-        
-        for tile in self.terminal_honor_tiles:
-            count = tile_count.get(tile, 0)
-            if count == 2:
-                pair_count += 1
-            elif count == 1:
-                single_count += 1
-            elif count > 2 or count == 0:
-                return False
-        
-        # 必须有12种单张 + 1种对子
-        return pair_count == 1 and single_count == 12
+
+        return self._check_thirteen_orphans_counts(self._hand_to_counts(tiles))
     
     def _check_seven_pairs(self, tiles: List[str]) -> bool:
         """
@@ -179,114 +508,234 @@ class MahjongTingpaiWithJoker:
         """
         if len(tiles) != 14:
             return False
-            
-        counter = Counter(tiles)
-        pairs = [count for count in counter.values() if count == 2]
-        return len(pairs) == 7 and sum(counter.values()) == 14
+
+        return self._check_seven_pairs_counts(self._hand_to_counts(tiles))
     
+    def _hand_to_counts(self, tiles: List[str]) -> List[int]:
+        """
+        把牌列表转换为34长度的计数向量（不含百搭牌）
+        索引顺序与normal_tiles一致：0-8条，9-17万，18-26筒，27-33字
+        """
+        counts = [0] * 34
+        for tile in tiles:
+            counts[self._tile_ids[tile]] += 1
+        return counts
+
     def _check_standard_win(self, tiles: List[str]) -> bool:
         """
         检查是否为标准胡牌（4面子+1对子）
         """
-        return self._try_combinations(tiles, [], 0)
+        return self._check_standard_win_counts(self._hand_to_counts(tiles))
+
+    def _check_standard_win_counts(self, counts: List[int]) -> bool:
+        """
+        基于花色块可行性表检查4面子+1对子：
+        四个块独立拆分、查表后按面子/对子数组合
+        """
+        masks = (
+            _block_mask(tuple(counts[0:9]), True, _SUIT_BLOCK_TABLE),
+            _block_mask(tuple(counts[9:18]), True, _SUIT_BLOCK_TABLE),
+            _block_mask(tuple(counts[18:27]), True, _SUIT_BLOCK_TABLE),
+            _block_mask(tuple(counts[27:34]), False, _HONOR_BLOCK_TABLE),
+        )
+        return _combine_block_masks(masks)
     
-    def _try_combinations(self, remaining: List[str], groups: List[List[str]], pair_count: int) -> bool:
+    def _check_seven_pairs_counts(self, counts: List[int]) -> bool:
         """
-        递归尝试所有可能的组合
+        在计数向量上检查七对子（恰好7种牌各2张）
         """
-        if not remaining:
-            # 检查是否有4个面子和1个对子
-            melds = [g for g in groups if len(g) == 3]
-            pairs = [g for g in groups if len(g) == 2]
-            return len(melds) == 4 and len(pairs) == 1
-        
-        if len(groups) > 5:  # 最多5组（4面子+1对子）
-            return False
-        
-        # 对剩余牌进行排序，确保处理顺序一致
-        remaining_sorted = sorted(remaining)
-        
-        # 取第一张牌，避免重复计算
-        first_tile = remaining_sorted[0]
-        
-        # 尝试组成对子（只有当还没有对子时）
-        if pair_count == 0 and remaining_sorted.count(first_tile) >= 2:
-            new_remaining = remaining_sorted.copy()
-            new_remaining.remove(first_tile)
-            new_remaining.remove(first_tile)
-            new_groups = groups + [[first_tile, first_tile]]
-            if self._try_combinations(new_remaining, new_groups, 1):
-                return True
-        
-        # 尝试组成刻子
-        if remaining_sorted.count(first_tile) >= 3:
-            new_remaining = remaining_sorted.copy()
-            new_remaining.remove(first_tile)
-            new_remaining.remove(first_tile)
-            new_remaining.remove(first_tile)
-            new_groups = groups + [[first_tile, first_tile, first_tile]]
-            if self._try_combinations(new_remaining, new_groups, pair_count):
+        return sum(1 for c in counts if c == 2) == 7 and sum(counts) == 14
+
+    def _check_thirteen_orphans_counts(self, counts: List[int]) -> bool:
+        """
+        在计数向量上检查国士无双（13种幺九牌，其中一种成对）
+        """
+        pair_count = 0
+        total = 0
+        for i in self._orphan_ids:
+            c = counts[i]
+            if c == 0 or c > 2:
+                return False
+            if c == 2:
+                pair_count += 1
+            total += c
+        # total==14说明没有幺九牌以外的牌
+        return pair_count == 1 and total == 14
+
+    def _shanten_counts(self, counts: List[int]) -> int:
+        """
+        计算13张计数向量的向听数（标准/七对子/国士三者取最小，0=听牌）
+        """
+        # 标准型：逐块累加(面子,搭子,对子)可行状态
+        acc = {(0, 0, 0)}
+        blocks = (
+            (tuple(counts[0:9]), True, _SUIT_STATE_TABLE),
+            (tuple(counts[9:18]), True, _SUIT_STATE_TABLE),
+            (tuple(counts[18:27]), True, _SUIT_STATE_TABLE),
+            (tuple(counts[27:34]), False, _HONOR_STATE_TABLE),
+        )
+        for block, allow_seq, table in blocks:
+            block_states = _block_states(block, allow_seq, table)
+            acc = {
+                (min(4, m + bm), min(4, t + bt), min(1, p + bp))
+                for m, t, p in acc
+                for bm, bt, bp in block_states
+            }
+        # 搭子数超过4-面子数的部分没有用
+        shanten = min(8 - 2 * m - min(t, 4 - m) - p for m, t, p in acc)
+
+        # 七对子：6 - 对子数 + 不足的牌种数
+        pairs = sum(1 for c in counts if c >= 2)
+        kinds = sum(1 for c in counts if c >= 1)
+        shanten = min(shanten, 6 - pairs + max(0, 7 - kinds))
+
+        # 国士无双：13 - 幺九牌种数 - 有无幺九对子
+        orphan_kinds = sum(1 for i in self._orphan_ids if counts[i] >= 1)
+        orphan_pair = any(counts[i] >= 2 for i in self._orphan_ids)
+        shanten = min(shanten, 13 - orphan_kinds - (1 if orphan_pair else 0))
+
+        return shanten
+
+    def _tenpai_candidates(self, counts: List[int]) -> List[int]:
+        """
+        听牌状态下的胡牌候选：手上已有的牌、同花色距离2以内的邻牌，
+        以及全幺九手的全部幺九牌
+        """
+        candidates = set()
+        for t in range(34):
+            if counts[t]:
+                candidates.add(t)
+                if t < 27:
+                    base = t - t % 9
+                    for d in (t - 2, t - 1, t + 1, t + 2):
+                        if base <= d < base + 9:
+                            candidates.add(d)
+
+        if all(counts[i] == 0 or i in self._orphan_id_set for i in range(34)):
+            candidates.update(self._orphan_id_set)
+
+        return sorted(candidates)
+
+    def _is_winning_counts(self, counts: List[int], packed: int = None) -> bool:
+        """
+        判断14张牌的计数向量是否为胡牌牌型（不含百搭牌）
+        调用方若增量维护了打包指纹，可传入packed走SWAR七对子检查
+        """
+        if packed is not None:
+            if _seven_pairs_packed(packed):
                 return True
-        
-        # 尝试组成顺子（非字牌）
-        if not first_tile.endswith('z'):
-            suit = first_tile[-1]
-            num = int(first_tile[0])
-            if num <= 7:  # 确保能组成顺子
-                tile2 = f"{num+1}{suit}"
-                tile3 = f"{num+2}{suit}"
-                if tile2 in remaining_sorted and tile3 in remaining_sorted:
-                    new_remaining = remaining_sorted.copy()
-                    new_remaining.remove(first_tile)
-                    new_remaining.remove(tile2)
-                    new_remaining.remove(tile3)
-                    new_groups = groups + [[first_tile, tile2, tile3]]
-                    if self._try_combinations(new_remaining, new_groups, pair_count):
-                        return True
-        
-        return False
-    
+        elif self._check_seven_pairs_counts(counts):
+            return True
+        return (self._check_thirteen_orphans_counts(counts) or
+                self._check_standard_win_counts(counts))
+
+    @lru_cache(maxsize=1 << 16)
+    def _can_win_counts(self, key: bytes) -> bool:
+        """
+        按计数向量字节串缓存的14张胡牌判断
+        百搭替换枚举和逐张试摸会反复生成相同的多重集，直接命中缓存
+        """
+        return self._is_winning_counts(list(key))
+
     def is_winning_hand(self, tiles: List[str]) -> bool:
         """
         判断14张牌是否为胡牌牌型（支持百搭牌）
         """
         if len(tiles) != 14:
             return False
-        
+
         # 如果没有百搭牌，直接检查
         if 'j' not in tiles:
-            return (self._check_standard_win(tiles) or 
-                    self._check_seven_pairs(tiles) or 
-                    self._check_thirteen_orphans(tiles))
-        
-        # 有百搭牌时，尝试所有可能的替换组合
-        combinations = self.generate_joker_combinations(tiles)
-        
-        for combo in combinations:
-            if (self._check_standard_win(combo) or 
-                self._check_seven_pairs(combo) or 
-                self._check_thirteen_orphans(combo)):
+            return self._can_win_counts(bytes(self._hand_to_counts(tiles)))
+
+        # 有百搭牌时先走闭式判据（七对子/国士无双可直接从基础计数判定），
+        # 再按计数增量原地枚举替换，第一个胡牌组合立即返回
+        joker_count = tiles.count('j')
+        base_counts = self._hand_to_counts([t for t in tiles if t != 'j'])
+
+        if joker_count <= 4:
+            # 超过4张百搭时组合只剩13张，闭式判据的14张前提不成立
+            if (self._seven_pairs_with_jokers(base_counts, joker_count) or
+                    self._orphans_with_jokers(base_counts, joker_count)):
                 return True
-        
+
+        return self._joker_winning(base_counts, min(joker_count, 4))
+
+    def _seven_pairs_with_jokers(self, counts: List[int], joker_count: int) -> bool:
+        """
+        闭式判断：基础计数+百搭能否凑成七对子（前提：总张数14）
+        百搭先补齐单张、剩余两两成新对，所以只需没有3张以上的牌
+        且已有对子+单张的种类数不超过7
+        """
+        pairs = singles = 0
+        for c in counts:
+            if c > 2:
+                return False
+            if c == 2:
+                pairs += 1
+            elif c == 1:
+                singles += 1
+        return pairs + singles <= 7
+
+    def _orphans_with_jokers(self, counts: List[int], joker_count: int) -> bool:
+        """
+        闭式判断：基础计数+百搭能否凑成国士无双（前提：总张数14）
+        百搭补上缺失的幺九牌种和将头，所以只需全是幺九牌、
+        没有3张以上、成对的种类至多1个
+        """
+        pair_kinds = 0
+        for i in range(34):
+            c = counts[i]
+            if c == 0:
+                continue
+            if i not in self._orphan_id_set or c > 2:
+                return False
+            if c == 2:
+                pair_kinds += 1
+        return pair_kinds <= 1
+
+    def _joker_winning(self, counts: List[int], k: int, start: int = 0) -> bool:
+        """
+        递归枚举k张百搭的替换（替换牌索引非降序，每个多重集只访问一次），
+        在同一个计数向量上加减回溯，不物化组合列表
+        """
+        if k == 0:
+            return self._can_win_counts(bytes(counts))
+
+        for i in range(start, 34):
+            counts[i] += 1
+            found = self._joker_winning(counts, k - 1, i)
+            counts[i] -= 1
+            if found:
+                return True
+
         return False
     
+    @lru_cache(maxsize=4096)
+    def _winning_type_counts(self, key: bytes) -> str:
+        """
+        按计数向量字节串缓存的14张胡牌类型判断（无百搭）
+        """
+        counts = list(key)
+        if self._check_thirteen_orphans_counts(counts):
+            return "国士无双"
+        elif self._check_seven_pairs_counts(counts):
+            return "七对子"
+        elif self._check_standard_win_counts(counts):
+            return "标准胡牌"
+        else:
+            return "非胡牌"
+
     def get_winning_type(self, tiles: List[str]) -> str:
         """
         获取胡牌类型（支持百搭牌）
         """
         if len(tiles) != 14:
             return "非胡牌"
-        
+
         # 如果没有百搭牌，直接检查
         if 'j' not in tiles:
-            if self._check_thirteen_orphans(tiles):
-                return "国士无双"
-            elif self._check_seven_pairs(tiles):
-                return "七对子"
-            elif self._check_standard_win(tiles):
-                return "标准胡牌"
-            else:
-                return "非胡牌"
+            return self._winning_type_counts(bytes(self._hand_to_counts(tiles)))
         
         # 有百搭牌时，尝试所有可能的替换组合
         combinations = self.generate_joker_combinations(tiles)
@@ -307,105 +756,195 @@ class MahjongTingpaiWithJoker:
         """
         if len(hand) != 13:
             raise ValueError("手牌必须是13张")
-        
+
         winning_tiles = set()
-        hand_counter = Counter(hand)
-        
-        for tile in self.all_tiles:
+
+        # 含百搭时沿用基于替换组合的完整检查
+        if 'j' in hand:
+            joker_count = hand.count('j')
+            base_counts = self._hand_to_counts([t for t in hand if t != 'j'])
+
             # 检查加入这张牌是否会超过4张限制（百搭牌除外）
-            if tile != 'j' and hand_counter[tile] >= 4:
-                continue
-            
-            test_hand = hand + [tile]
-            if self.is_winning_hand(test_hand):
-                winning_tiles.add(tile)
-        
-        return winning_tiles
+            candidates = [tile for tile in self.all_tiles
+                          if tile == 'j' or base_counts[self._tile_ids[tile]] < 4]
+
+            # 两张以上百搭时枚举量大，把候选检查分摊到进程池
+            if joker_count >= 2:
+                from concurrent.futures.process import BrokenProcessPool
+                try:
+                    key = bytes(base_counts)
+                    results = _candidate_pool().map(
+                        _check_candidate,
+                        [(key, joker_count, tile) for tile in candidates],
+                        chunksize=5)
+                    return {tile for tile, ok in results if ok}
+                except (OSError, BrokenProcessPool):
+                    # 环境不允许多进程或工作进程中途死亡时退回串行检查
+                    _discard_candidate_pool()
+
+            for tile in candidates:
+                test_hand = hand + [tile]
+                if self.is_winning_hand(test_hand):
+                    winning_tiles.add(tile)
+
+            return winning_tiles
+
+        # 无百搭：计数向量元组是手牌的规范指纹，结果可直接缓存
+        return set(self._find_winning_tiles_counts(tuple(self._hand_to_counts(hand))))
+
+    @lru_cache(maxsize=4096)
+    def _find_winning_tiles_counts(self, counts_key: Tuple[int, ...]) -> frozenset:
+        """
+        计算13张无百搭计数向量的听牌集合（结果按规范键缓存）
+        """
+        counts = list(counts_key)
+
+        if _cy_winning_mask is not None:
+            return self._winning_set_from_mask(
+                _cy_winning_mask(bytearray(counts)), counts)
+
+        if _jit_winning_mask is not None:
+            return self._winning_set_from_mask(_jit_winning_mask(counts), counts)
+
+        # 向听数预检：未听牌直接返回空集；听牌时只探测候选牌
+        if self._shanten_counts(counts) > 0:
+            return frozenset()
+
+        winning_tiles = set()
+        packed = _pack_counts(counts)
+        for t in self._tenpai_candidates(counts):
+            counts[t] += 1
+            if self._is_winning_counts(counts, packed + (1 << (4 * t))):
+                if counts[t] <= 4:
+                    winning_tiles.add(self._id_to_tile[t])
+                winning_tiles.add('j')
+            counts[t] -= 1
+
+        return frozenset(winning_tiles)
+
+    def _winning_set_from_mask(self, mask: int, counts: List[int]) -> frozenset:
+        """
+        把内核返回的34位听牌掩码展开成牌集合
+        """
+        winning_tiles = set()
+        for t in range(34):
+            if (mask >> t) & 1:
+                # 手里已有4张的牌摸不到第5张，但百搭可以顶替它
+                if counts[t] < 4:
+                    winning_tiles.add(self._id_to_tile[t])
+                winning_tiles.add('j')
+        return frozenset(winning_tiles)
     
+    def find_winning_tiles_with_types(self, hand: List[str]) -> Dict[str, str]:
+        """
+        找出所有可以胡的牌及其胡牌类型（支持百搭牌）
+        类型判断在听牌扫描用过的计数向量上原地试摸，命中已有缓存
+        """
+        winning_map = {}
+        joker_free = 'j' not in hand
+        counts = self._hand_to_counts(hand) if joker_free else None
+
+        for tile in self.find_winning_tiles(hand):
+            if joker_free and tile != 'j':
+                t = self._tile_ids[tile]
+                counts[t] += 1
+                winning_map[tile] = self._winning_type_counts(bytes(counts))
+                counts[t] -= 1
+            else:
+                winning_map[tile] = self.get_winning_type(hand + [tile])
+
+        return winning_map
+
     def analyze_hand(self, hand_str: str) -> dict:
         """
         分析手牌，返回详细信息（支持百搭牌）
         """
         try:
-            hand = self.parse_hand(hand_str)
-            
-            if len(hand) != 13:
-                return {
-                    'error': f'手牌数量错误：{len(hand)}张，应该是13张',
-                    'hand': hand
-                }
-            
-            # 检查牌的有效性
-            invalid_tiles = [tile for tile in hand if tile not in self.all_tiles]
-            if invalid_tiles:
-                return {
-                    'error': f'无效的牌：{invalid_tiles}',
-                    'hand': hand
-                }
-            
-            # 检查每种牌是否超过4张（百搭牌除外）
-            tile_count = Counter(hand)
-            over_limit = [tile for tile, count in tile_count.items() 
-                         if tile != 'j' and count > 4]
-            if over_limit:
+            counts, joker_count, invalid_tiles = self._parse_counts(hand_str)
+
+            # 检查牌的有效性（扫描时挑出的超范围数字）
+            if invalid_tiles and sum(counts) + joker_count + len(invalid_tiles) == 13:
                 return {
-                    'error': f'以下牌超过4张限制：{over_limit}',
-                    'hand': hand
+                    'error': f'无效的牌：{sorted(invalid_tiles)}',
+                    'hand': self._expand_counts(counts, joker_count, invalid_tiles),
+                    'hand_str': hand_str
                 }
-            
-            winning_tiles = self.find_winning_tiles(hand)
-            
-            # 分析可能的胡牌类型
-            winning_types = set()
-            for tile in winning_tiles:
-                test_hand = hand + [tile]
-                win_type = self.get_winning_type(test_hand)
-                if win_type != "非胡牌":
-                    winning_types.add(win_type)
-            
-            # 统计手牌信息
-            suits_count = {
-                's': len([t for t in hand if t.endswith('s')]),
-                'm': len([t for t in hand if t.endswith('m')]),
-                'p': len([t for t in hand if t.endswith('p')]),
-                'z': len([t for t in hand if t.endswith('z')]),
-                'j': hand.count('j')
-            }
-            
-            return {
-                'hand': hand,
-                'hand_str': hand_str,
-                'tile_count': len(hand),
-                'suits_distribution': suits_count,
-                'winning_tiles': sorted(list(winning_tiles)),
-                'winning_count': len(winning_tiles),
-                'winning_types': list(winning_types),
-                'is_tingpai': len(winning_tiles) > 0,
-                'tile_frequency': dict(tile_count),
-                'joker_count': hand.count('j')
-            }
-            
+
+            result = self.analyze_counts(counts, joker_count, invalid_tiles)
+            result['hand_str'] = hand_str
+            return result
+
         except Exception as e:
             return {
                 'error': f'解析错误：{str(e)}',
                 'hand_str': hand_str
             }
+
+    def analyze_counts(self, counts: List[int], joker_count: int = 0,
+                       _invalid_tiles: List[str] = ()) -> dict:
+        """
+        直接从计数向量分析听牌（跳过字符串解析的结构化入口）
+        """
+        hand = self._expand_counts(counts, joker_count, _invalid_tiles)
+
+        if len(hand) != 13:
+            return {
+                'error': f'手牌数量错误：{len(hand)}张，应该是13张',
+                'hand': hand
+            }
+
+        # 检查每种牌是否超过4张（百搭牌除外）
+        over_limit = [self._id_to_tile[i] for i in range(34) if counts[i] > 4]
+        if over_limit:
+            return {
+                'error': f'以下牌超过4张限制：{over_limit}',
+                'hand': hand
+            }
+
+        # 一次扫描同时得到可胡的牌和对应胡牌类型
+        winning_map = self.find_winning_tiles_with_types(hand)
+        winning_tiles = set(winning_map)
+        winning_types = set(winning_map.values())
+        winning_types.discard("非胡牌")
+
+        # 统计手牌信息：直接对计数向量分段求和
+        suits_count = {
+            's': sum(counts[0:9]),
+            'm': sum(counts[9:18]),
+            'p': sum(counts[18:27]),
+            'z': sum(counts[27:34]),
+            'j': joker_count
+        }
+        tile_frequency = {self._id_to_tile[i]: counts[i]
+                          for i in range(34) if counts[i]}
+        if joker_count:
+            tile_frequency['j'] = joker_count
+
+        return {
+            'hand': hand,
+            'tile_count': len(hand),
+            'suits_distribution': suits_count,
+            'winning_tiles': sorted(winning_tiles),
+            'winning_count': len(winning_tiles),
+            'winning_types': list(winning_types),
+            'is_tingpai': len(winning_tiles) > 0,
+            'tile_frequency': tile_frequency,
+            'joker_count': joker_count
+        }
     
+    def clear_caches(self) -> None:
+        """
+        清空分析结果缓存（长会话下的内存控制阀）
+        """
+        self._find_winning_tiles_counts.cache_clear()
+        self._can_win_counts.cache_clear()
+        self._winning_type_counts.cache_clear()
+
     def format_tile_name(self, tile: str) -> str:
         """
         格式化牌名显示（支持百搭牌）
         """
-        if tile == 'j':
-            return '百搭'
-        elif tile.endswith('z'):
-            return self.honor_names.get(tile, tile)
-        elif tile.endswith('s'):
-            return f"{tile[0]}条"
-        elif tile.endswith('m'):
-            return f"{tile[0]}万"
-        elif tile.endswith('p'):
-            return f"{tile[0]}筒"
-        return tile
+        return self._display_name.get(tile, tile)
     
     def print_analysis(self, result: dict):
         """
@@ -453,6 +992,9 @@ class MahjongTingpaiWithJoker:
         
         print("=" * 60)
 
+# demo.py/test_mahjong.py等按旧类名导入，保留别名
+MahjongTingpai = MahjongTingpaiWithJoker
+
 def main():
     """
     主函数
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可选的Cython加速内核构建脚本
+运行 python setup.py build_ext --inplace 生成mahjong_core扩展；
+不构建也不影响使用，主程序会自动退回numba或纯Python实现
+"""
+
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize('mahjong_core.pyx', language_level=3)
+except ImportError:
+    ext_modules = []
+
+setup(
+    name='mahjong-tingpai',
+    py_modules=['mahjong_tingpai'],
+    ext_modules=ext_modules,
+)